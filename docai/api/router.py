@@ -1,20 +1,12 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.orm import Session
 from pathlib import Path
-import aiofiles
-import tempfile
 
-from ..config.settings import settings
 from ..services.document_processor.document_processor import DocumentProcessor
 from ..data.repositories.document_repository import DocumentRepository
-from ..data.models.document import Base
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-
-# Database setup
-engine = create_engine(settings.final_database_url)
-Base.metadata.create_all(bind=engine)
-SessionLocal = sessionmaker(autocommit=False, autoload=True, bind=engine)
+from ..data.repositories.job_repository import JobRepository
+from ..data.database import SessionLocal
+from .uploads import stream_upload_to_storage
 
 router = APIRouter()
 
@@ -25,48 +17,62 @@ def get_db():
     finally:
         db.close()
 
-@router.post("/upload")
+# The body is parsed by hand (see stream_upload_to_storage), so describe the
+# form for the OpenAPI docs explicitly
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"]
+                }
+            }
+        }
+    }
+}
+
+@router.post("/upload", openapi_extra=UPLOAD_REQUEST_BODY)
 async def upload_file(
-    file: UploadFile = File(...),
+    request: Request,
     enhance_with_ai: bool = True,
+    queue: bool = False,
+    priority: int = 0,
     db: Session = Depends(get_db)
 ):
-    # Validate file extension
-    file_extension = Path(file.filename).suffix.lower()[1:]
-    if file_extension not in settings.SUPPORTED_FORMATS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file format. Supported formats: {settings.SUPPORTED_FORMATS}"
+    document_repository = DocumentRepository(db)
+    processor = DocumentProcessor(document_repository)
+
+    # Stream the upload straight to its final storage location instead of
+    # letting Starlette spool the whole body to a temporary file first
+    filename, stored_path = await stream_upload_to_storage(request, processor)
+
+    if queue:
+        # Hand the stored file to a worker instead of processing in-process
+        job_id = processor.enqueue_stored_file(
+            stored_path,
+            filename,
+            JobRepository(db),
+            enhance_with_ai,
+            priority
         )
+        return {"status": "queued", "job_id": job_id}
 
-    # Create temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as temp_file:
-        # Write uploaded file to temporary file
-        async with aiofiles.open(temp_file.name, 'wb') as out_file:
-            content = await file.read()
-            await out_file.write(content)
-        
-        # Process the file
-        document_repository = DocumentRepository(db)
-        processor = DocumentProcessor(document_repository)
-        
-        try:
-            doc_id = processor.process_file(
-                Path(temp_file.name),
-                enhance_with_ai
-            )
-            
-            if doc_id:
-                return {"status": "success", "document_id": doc_id}
-            else:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Failed to process the document"
-                )
-                
-        finally:
-            # Clean up temporary file
-            Path(temp_file.name).unlink(missing_ok=True)
+    doc_id = processor.process_stored_file(
+        stored_path,
+        filename,
+        enhance_with_ai
+    )
+
+    if doc_id:
+        return {"status": "success", "document_id": doc_id}
+    else:
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to process the document"
+        )
 
 @router.post("/process-directory")
 async def process_directory(
@@ -116,3 +122,26 @@ async def get_document(document_id: int, db: Session = Depends(get_db)):
         "created_at": document.created_at,
         "updated_at": document.updated_at
     }
+
+@router.get("/job/{job_id}")
+async def get_job(job_id: int, db: Session = Depends(get_db)):
+    job_repository = JobRepository(db)
+    job = job_repository.get_by_id(job_id)
+
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job not found with id: {job_id}"
+        )
+
+    return {
+        "id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "priority": job.priority,
+        "attempts": job.attempts,
+        "document_id": job.document_id,
+        "last_error": job.last_error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    }
@@ -0,0 +1,126 @@
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+from pathlib import Path
+from typing import List, Optional, Tuple
+import aiofiles
+import os
+
+from ..config.settings import settings
+from ..services.document_processor.document_processor import DocumentProcessor
+
+UPLOAD_FIELD = "file"
+
+class _FilePartCollector:
+    """MultipartParser callbacks that pick out the upload's file part.
+
+    The parser calls these synchronously, so file data is only queued here and
+    written by the caller between chunks, off the callback path.
+    """
+
+    def __init__(self):
+        self.filename: Optional[str] = None
+        self.pending: List[bytes] = []
+        self.finished = False
+        self._in_file_part = False
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+        name = options.get(b"name", b"").decode("latin-1")
+        filename = options.get(b"filename")
+        if name != UPLOAD_FIELD or filename is None or self.filename is not None:
+            return
+
+        self.filename = Path(filename.decode("utf-8")).name
+        file_extension = Path(self.filename).suffix.lower()[1:]
+        if file_extension not in settings.SUPPORTED_FORMATS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported file format. Supported formats: {settings.SUPPORTED_FORMATS}"
+            )
+        self._in_file_part = True
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file_part:
+            self.pending.append(data[start:end])
+
+    def on_part_end(self):
+        if self._in_file_part:
+            self._in_file_part = False
+            self.finished = True
+
+async def stream_upload_to_storage(request: Request, processor: DocumentProcessor) -> Tuple[str, Path]:
+    """Parse a multipart upload from the request body and write its file part
+    straight into storage, enforcing MAX_FILE_SIZE as the bytes arrive.
+
+    Returns the uploaded filename and the stored path. The file is written to
+    a .partial path and only renamed into place once complete.
+    """
+    _, params = parse_options_header(request.headers.get("content-type"))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    collector = _FilePartCollector()
+    parser = MultipartParser(boundary, collector.callbacks())
+    stored_path = partial_path = out_file = None
+    written = 0
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if collector.filename is None:
+                continue
+            if out_file is None:
+                stored_path = processor.storage_path_for(collector.filename)
+                partial_path = processor.partial_path_for(stored_path)
+                out_file = await aiofiles.open(partial_path, 'wb')
+            for data in collector.pending:
+                written += len(data)
+                if written > settings.MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File exceeds maximum size of {settings.MAX_FILE_SIZE} bytes"
+                    )
+                await out_file.write(data)
+            collector.pending.clear()
+        parser.finalize()
+
+        if not collector.finished:
+            raise HTTPException(status_code=400, detail=f"Missing '{UPLOAD_FIELD}' file field")
+        await out_file.close()
+        out_file = None
+        os.replace(partial_path, stored_path)
+    finally:
+        if out_file is not None:
+            await out_file.close()
+        if partial_path is not None:
+            partial_path.unlink(missing_ok=True)
+
+    return collector.filename, stored_path
@@ -0,0 +1,114 @@
+import argparse
+import json
+import signal
+import threading
+
+from .config.settings import settings
+from .data.models.job import JobType
+
+def run_worker(args: argparse.Namespace):
+    from .data.database import SessionLocal
+    from .services.worker.worker import Worker
+
+    workers = [
+        Worker(SessionLocal, job_types=args.job_types)
+        for _ in range(args.concurrency)
+    ]
+
+    def shutdown(signum, frame):
+        for worker in workers:
+            worker.stop()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    threads = [threading.Thread(target=worker.run) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def run_reprocess(args: argparse.Namespace):
+    from .data.database import SessionLocal
+    from .services.reprocessor.reprocessor import Reprocessor
+
+    reprocessor = Reprocessor(SessionLocal)
+    if args.dry_run:
+        print(json.dumps(reprocessor.estimate(), indent=2))
+        return
+
+    if args.restart:
+        reprocessor.clear_checkpoint()
+
+    def shutdown(signum, frame):
+        reprocessor.stop()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    enqueued = reprocessor.run(max_documents=args.limit)
+    print(f"Queued {enqueued} documents for reprocessing")
+
+def run_migrate(args: argparse.Namespace):
+    from .data.database import engine
+    from .data.models.document import Base
+    from .data.schema import add_missing_columns
+
+    added = add_missing_columns(engine, Base.metadata)
+    if added:
+        print("Added columns: " + ", ".join(added))
+    else:
+        print("Database schema is up to date")
+
+def run_server(args: argparse.Namespace):
+    import uvicorn
+    uvicorn.run("docai.main:app", host=args.host, port=args.port)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="docai")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    server_parser = subparsers.add_parser("serve", help="Run the HTTP API")
+    server_parser.add_argument("--host", default=settings.API_HOST)
+    server_parser.add_argument("--port", type=int, default=settings.API_PORT)
+    server_parser.set_defaults(func=run_server)
+
+    migrate_parser = subparsers.add_parser(
+        "migrate",
+        help="Add columns introduced by an upgrade to an existing database"
+    )
+    migrate_parser.set_defaults(func=run_migrate)
+
+    worker_parser = subparsers.add_parser("worker", help="Run queued extraction/enhancement jobs")
+    worker_parser.add_argument(
+        "--job-type",
+        dest="job_types",
+        action="append",
+        choices=[JobType.EXTRACT, JobType.ENHANCE, JobType.REPROCESS],
+        help="Only run jobs of this type (repeatable; default: all)"
+    )
+    worker_parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    worker_parser.set_defaults(func=run_worker)
+
+    reprocess_parser = subparsers.add_parser(
+        "reprocess",
+        help="Queue documents produced by outdated extractor/OCR/prompt versions"
+    )
+    reprocess_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only print an estimate of the work and LLM tokens involved"
+    )
+    reprocess_parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the checkpoint and rescan from the first document"
+    )
+    reprocess_parser.add_argument("--limit", type=int, help="Queue at most this many documents")
+    reprocess_parser.set_defaults(func=run_reprocess)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
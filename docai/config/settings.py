@@ -5,6 +5,10 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./docai.db"
     
+    @property
+    def final_database_url(self) -> str:
+        return self.DATABASE_URL
+    
     # Storage
     STORAGE_PATH: str = "storage"
     
@@ -19,6 +23,35 @@ class Settings(BaseSettings):
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # Default: 10MB
     SUPPORTED_FORMATS: list = ["pdf", "png", "jpg", "jpeg", "docx", "xlsx"]
     
+    # OCR
+    OCR_DPI: int = 300
+    OCR_LANG: str = "eng"
+    # Tesseract version every node stamps and compares against (e.g. "5.3.0");
+    # defaults to the locally installed one
+    OCR_TESSERACT_VERSION: str = ""
+    
+    # Workers
+    WORKER_LEASE_SECONDS: int = 300
+    WORKER_HEARTBEAT_SECONDS: int = 30
+    WORKER_POLL_INTERVAL: float = 2.0
+    WORKER_CONCURRENCY: int = 1
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: int = 30
+    
+    # Reprocessing
+    REPROCESS_BATCH_SIZE: int = 500
+    REPROCESS_MAX_PENDING: int = 100
+    REPROCESS_POLL_INTERVAL: float = 5.0
+    REPROCESS_PRIORITY: int = -10
+    REPROCESS_ENHANCE_UNVERSIONED: bool = False
+    REPROCESS_CHECKPOINT_PATH: str = ""
+    
+    @property
+    def final_reprocess_checkpoint_path(self) -> Path:
+        if self.REPROCESS_CHECKPOINT_PATH:
+            return Path(self.REPROCESS_CHECKPOINT_PATH)
+        return self.final_storage_path / ".reprocess_checkpoint.json"
+    
     # API
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
@@ -0,0 +1,10 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from ..config.settings import settings
+from .models.document import Base
+from .models import job  # noqa: F401  (registers the jobs table on Base)
+
+engine = create_engine(settings.final_database_url)
+Base.metadata.create_all(bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -12,5 +12,12 @@ class Document(Base):
     file_type = Column(String(10), nullable=False)
     content = Column(Text, nullable=True)
     storage_path = Column(String(512), nullable=False)
+
+    # Raw extractor output (before AI enhancement) and the versions of each
+    # stage that produced content, used to find documents to reprocess
+    extracted_content = Column(Text, nullable=True)
+    extractor_version = Column(String(64), nullable=True, index=True)
+    ocr_version = Column(String(64), nullable=True)
+    prompt_version = Column(String(64), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
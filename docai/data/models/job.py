@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index
+from datetime import datetime
+from .document import Base
+
+class JobType:
+    EXTRACT = "extract"
+    ENHANCE = "enhance"
+    REPROCESS = "reprocess"
+
+class JobStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, default=JobStatus.PENDING)
+    priority = Column(Integer, nullable=False, default=0)
+
+    # Payload: extraction jobs point at a file on shared storage,
+    # enhancement jobs at an existing document
+    source_path = Column(String(512), nullable=True)
+    filename = Column(String(255), nullable=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=True)
+    enhance_with_ai = Column(Boolean, nullable=False, default=False)
+
+    # Retry bookkeeping
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Lease held by the worker currently running the job
+    lease_owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_jobs_claim", "status", "priority", "available_at"),
+    )
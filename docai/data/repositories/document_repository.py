@@ -1,19 +1,41 @@
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from ..models.document import Document
 from datetime import datetime
+from typing import List, Optional
 
 class DocumentRepository:
     def __init__(self, db_session: Session):
         self.db_session = db_session
 
-    def create(self, filename: str, file_type: str, content: str, storage_path: str) -> Document:
+    def create(
+        self,
+        filename: str,
+        file_type: str,
+        content: str,
+        storage_path: str,
+        extracted_content: Optional[str] = None,
+        extractor_version: Optional[str] = None,
+        ocr_version: Optional[str] = None,
+        prompt_version: Optional[str] = None,
+        commit: bool = True
+    ) -> Document:
+        """Add a document; with commit=False it is only flushed (so it has an ID)
+        and the caller commits it together with other changes"""
         document = Document(
             filename=filename,
             file_type=file_type,
             content=content,
-            storage_path=storage_path
+            storage_path=storage_path,
+            extracted_content=extracted_content,
+            extractor_version=extractor_version,
+            ocr_version=ocr_version,
+            prompt_version=prompt_version
         )
         self.db_session.add(document)
+        if not commit:
+            self.db_session.flush()
+            return document
         self.db_session.commit()
         self.db_session.refresh(document)
         return document
@@ -24,10 +46,58 @@ class DocumentRepository:
     def get_all(self):
         return self.db_session.query(Document).all()
 
-    def update_content(self, document_id: int, content: str) -> Document:
+    def get_stale(
+        self,
+        extractor_version: str,
+        ocr_version: str,
+        prompt_version: str,
+        after_id: int = 0,
+        limit: int = 500
+    ) -> List[Document]:
+        """Return documents after after_id (in id order) produced by an outdated stage"""
+        stale = or_(
+            Document.extractor_version.is_(None),
+            Document.extractor_version != extractor_version,
+            Document.extracted_content.is_(None),
+            and_(
+                Document.ocr_version.isnot(None),
+                Document.ocr_version != ocr_version
+            ),
+            and_(
+                Document.prompt_version.isnot(None),
+                Document.prompt_version != prompt_version
+            )
+        )
+        return (
+            self.db_session.query(Document)
+            .filter(Document.id > after_id, stale)
+            .order_by(Document.id)
+            .limit(limit)
+            .all()
+        )
+
+    def update_content(
+        self,
+        document_id: int,
+        content: str,
+        extracted_content: Optional[str] = None,
+        extractor_version: Optional[str] = None,
+        ocr_version: Optional[str] = None,
+        prompt_version: Optional[str] = None
+    ) -> Document:
         document = self.get_by_id(document_id)
         if document:
             document.content = content
+            # Only overwrite provenance for the stages that were actually re-run
+            if extracted_content is not None:
+                document.extracted_content = extracted_content
+            if extractor_version is not None:
+                # A re-extraction replaces the whole extraction provenance,
+                # including clearing ocr_version when OCR no longer ran
+                document.extractor_version = extractor_version
+                document.ocr_version = ocr_version
+            if prompt_version is not None:
+                document.prompt_version = prompt_version
             document.updated_at = datetime.utcnow()
             self.db_session.commit()
             self.db_session.refresh(document)
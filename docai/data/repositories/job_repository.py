@@ -0,0 +1,207 @@
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from ..models.job import Job, JobStatus
+from ...config.settings import settings
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+
+class JobRepository:
+    # How many candidates to try per claim when row locking is unavailable
+    CLAIM_BATCH_SIZE = 10
+
+    def __init__(self, db_session: Session):
+        self.db_session = db_session
+
+    def enqueue(
+        self,
+        job_type: str,
+        source_path: Optional[str] = None,
+        filename: Optional[str] = None,
+        document_id: Optional[int] = None,
+        enhance_with_ai: bool = False,
+        priority: int = 0,
+        max_attempts: Optional[int] = None,
+        commit: bool = True
+    ) -> Job:
+        """Add a job; with commit=False it is only flushed and the caller commits it"""
+        job = Job(
+            job_type=job_type,
+            status=JobStatus.PENDING,
+            priority=priority,
+            source_path=source_path,
+            filename=filename,
+            document_id=document_id,
+            enhance_with_ai=enhance_with_ai,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            available_at=datetime.utcnow()
+        )
+        self.db_session.add(job)
+        if not commit:
+            self.db_session.flush()
+            return job
+        self.db_session.commit()
+        self.db_session.refresh(job)
+        return job
+
+    def get_by_id(self, job_id: int) -> Job:
+        return self.db_session.query(Job).filter(Job.id == job_id).first()
+
+    def count_unfinished(self, job_type: str) -> int:
+        """Number of jobs of a type that are still pending or running"""
+        return self.db_session.query(Job).filter(
+            Job.job_type == job_type,
+            Job.status.in_([JobStatus.PENDING, JobStatus.RUNNING])
+        ).count()
+
+    def _supports_skip_locked(self) -> bool:
+        return self.db_session.get_bind().dialect.name == "postgresql"
+
+    @staticmethod
+    def _claimable(now: datetime):
+        """Pending jobs that are due, or running jobs whose lease has expired"""
+        return or_(
+            and_(Job.status == JobStatus.PENDING, Job.available_at <= now),
+            and_(
+                Job.status == JobStatus.RUNNING,
+                Job.lease_expires_at < now,
+                Job.attempts < Job.max_attempts
+            )
+        )
+
+    @staticmethod
+    def _lease_values(worker_id: str, now: datetime, lease_seconds: int) -> dict:
+        return {
+            Job.status: JobStatus.RUNNING,
+            Job.lease_owner: worker_id,
+            Job.lease_expires_at: now + timedelta(seconds=lease_seconds),
+            Job.heartbeat_at: now,
+            Job.attempts: Job.attempts + 1,
+            Job.updated_at: now
+        }
+
+    def claim(
+        self,
+        worker_id: str,
+        lease_seconds: int,
+        job_types: Optional[Sequence[str]] = None
+    ) -> Optional[Job]:
+        """Lease the highest-priority claimable job to worker_id, or return None"""
+        now = datetime.utcnow()
+        query = self.db_session.query(Job).filter(self._claimable(now))
+        if job_types:
+            query = query.filter(Job.job_type.in_(job_types))
+        query = query.order_by(Job.priority.desc(), Job.id)
+
+        if self._supports_skip_locked():
+            # Postgres: rows locked by other claimers are skipped, never waited on
+            job = query.with_for_update(skip_locked=True).first()
+            if job is None:
+                self.db_session.rollback()
+                return None
+            for column, value in self._lease_values(worker_id, now, lease_seconds).items():
+                setattr(job, column.key, value)
+            self.db_session.commit()
+            self.db_session.refresh(job)
+            return job
+
+        # Fallback (SQLite): the database serialises writers, so a conditional
+        # UPDATE that re-checks claimability acts as a compare-and-set
+        candidate_ids = [row.id for row in query.with_entities(Job.id).limit(self.CLAIM_BATCH_SIZE)]
+        self.db_session.rollback()
+        for job_id in candidate_ids:
+            claimed = self.db_session.query(Job).filter(
+                Job.id == job_id,
+                self._claimable(now)
+            ).update(self._lease_values(worker_id, now, lease_seconds), synchronize_session=False)
+            self.db_session.commit()
+            if claimed:
+                return self.get_by_id(job_id)
+        return None
+
+    def _owned(self, job_id: int, worker_id: str):
+        return self.db_session.query(Job).filter(
+            Job.id == job_id,
+            Job.status == JobStatus.RUNNING,
+            Job.lease_owner == worker_id
+        )
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: int) -> bool:
+        """Extend the lease; returns False if the worker no longer holds it"""
+        now = datetime.utcnow()
+        extended = self._owned(job_id, worker_id).update({
+            Job.heartbeat_at: now,
+            Job.lease_expires_at: now + timedelta(seconds=lease_seconds)
+        }, synchronize_session=False)
+        self.db_session.commit()
+        return bool(extended)
+
+    def attach_document(self, job_id: int, worker_id: str, document_id: int) -> bool:
+        """Commit the job's document (and any pending changes in this session)
+        only if worker_id still holds the lease; otherwise roll them back"""
+        attached = self._owned(job_id, worker_id).update(
+            {Job.document_id: document_id},
+            synchronize_session=False
+        )
+        if not attached:
+            self.db_session.rollback()
+            return False
+        self.db_session.commit()
+        return True
+
+    def complete(self, job_id: int, worker_id: str, document_id: Optional[int] = None) -> bool:
+        """Mark the job done, committing any pending changes in this session with it
+        (e.g. follow-up jobs); if the lease was lost they are rolled back instead"""
+        now = datetime.utcnow()
+        values = {
+            Job.status: JobStatus.DONE,
+            Job.lease_owner: None,
+            Job.lease_expires_at: None,
+            Job.updated_at: now
+        }
+        if document_id is not None:
+            values[Job.document_id] = document_id
+        completed = self._owned(job_id, worker_id).update(values, synchronize_session=False)
+        if not completed:
+            self.db_session.rollback()
+            return False
+        self.db_session.commit()
+        return True
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        """Release the job for a retry with backoff, or mark it failed once out of attempts"""
+        job = self._owned(job_id, worker_id).first()
+        if not job:
+            self.db_session.rollback()
+            return False
+
+        now = datetime.utcnow()
+        job.last_error = error
+        job.lease_owner = None
+        job.lease_expires_at = None
+        job.updated_at = now
+        if job.attempts >= job.max_attempts:
+            job.status = JobStatus.FAILED
+        else:
+            job.status = JobStatus.PENDING
+            job.available_at = now + timedelta(
+                seconds=settings.JOB_RETRY_BACKOFF_SECONDS * job.attempts
+            )
+        self.db_session.commit()
+        return True
+
+    def reap_expired(self) -> int:
+        """Fail running jobs whose lease expired after their last allowed attempt"""
+        now = datetime.utcnow()
+        reaped = self.db_session.query(Job).filter(
+            Job.status == JobStatus.RUNNING,
+            Job.lease_expires_at < now,
+            Job.attempts >= Job.max_attempts
+        ).update({
+            Job.status: JobStatus.FAILED,
+            Job.last_error: "Lease expired",
+            Job.lease_owner: None,
+            Job.lease_expires_at: None,
+            Job.updated_at: now
+        }, synchronize_session=False)
+        self.db_session.commit()
+        return reaped
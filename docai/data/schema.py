@@ -0,0 +1,47 @@
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex
+from typing import List
+
+def _column_exists(engine: Engine, table_name: str, column_name: str) -> bool:
+    return column_name in {column["name"] for column in inspect(engine).get_columns(table_name)}
+
+def add_missing_columns(engine: Engine, metadata: MetaData) -> List[str]:
+    """Add columns declared on the models but missing from existing tables.
+
+    create_all only creates missing tables, so columns added to a model later
+    (all nullable) would otherwise break every query on an upgraded database.
+    Safe to run from several processes at once: a column another process added
+    first is skipped. Returns the columns that were missing as "table.column".
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    # Postgres can skip an existing column itself; elsewhere a failed ALTER is
+    # re-checked below
+    if_not_exists = "IF NOT EXISTS " if engine.dialect.name == "postgresql" else ""
+    added = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in existing_columns]
+        for column in missing:
+            column_type = column.type.compile(dialect=engine.dialect)
+            try:
+                with engine.begin() as connection:
+                    connection.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {if_not_exists}{column.name} {column_type}"
+                    ))
+            except DBAPIError:
+                if not _column_exists(engine, table.name, column.name):
+                    raise
+                continue
+            added.append(f"{table.name}.{column.name}")
+        # Indexes on the new columns weren't created with the table either
+        missing_names = {column.name for column in missing}
+        with engine.begin() as connection:
+            for index in table.indexes:
+                if missing_names & {column.name for column in index.columns}:
+                    connection.execute(CreateIndex(index, if_not_exists=True))
+    return added
@@ -2,6 +2,15 @@ from openai import OpenAI
 from ...config.settings import settings
 
 class AIProcessor:
+    # Bump whenever the prompt changes so enhanced documents get reprocessed
+    PROMPT_VERSION = "1"
+    MODEL = "gpt-4"
+    MAX_TOKENS = 1500
+
+    @classmethod
+    def version(cls) -> str:
+        return f"{cls.PROMPT_VERSION}/{cls.MODEL}"
+
     def __init__(self):
         self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
@@ -16,13 +25,13 @@ class AIProcessor:
         """
 
         response = self.client.chat.completions.create(
-            model="gpt-4",
+            model=self.MODEL,
             messages=[
                 {"role": "system", "content": "You are a document text extraction enhancement assistant."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
-            max_tokens=1500
+            max_tokens=self.MAX_TOKENS
         )
 
         return response.choices[0].message.content.strip()
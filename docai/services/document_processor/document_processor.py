@@ -1,10 +1,19 @@
+import os
 import shutil
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Set
 from ...config.settings import settings
 from ..text_extractor.text_extractor import TextExtractor
 from ..ai_processor.ai_processor import AIProcessor
 from ...data.repositories.document_repository import DocumentRepository
+from ...data.repositories.job_repository import JobRepository
+from ...data.models.job import JobType
+from ...data.models.document import Document
+
+class Stage:
+    EXTRACT = "extract"
+    ENHANCE = "enhance"
 
 class DocumentProcessor:
     def __init__(self, document_repository: DocumentRepository):
@@ -14,12 +23,30 @@ class DocumentProcessor:
         self.storage_path = settings.final_storage_path
         self.storage_path.mkdir(exist_ok=True)
 
+    def _extraction_versions(self, used_ocr: bool) -> dict:
+        """Versions to record for extracted text; OCR only counts if Tesseract actually ran"""
+        return {
+            "extractor_version": self.text_extractor.VERSION,
+            "ocr_version": self.text_extractor.ocr_version() if used_ocr else None
+        }
+
+    def storage_path_for(self, original_filename: str) -> Path:
+        """Return a unique path in the storage directory for a file with the given name"""
+        original_path = Path(original_filename)
+        storage_filename = f"{original_path.stem}_{time.time_ns()}{original_path.suffix}"
+        return self.storage_path / storage_filename
+
+    @staticmethod
+    def partial_path_for(storage_file_path: Path) -> Path:
+        """Return the temporary path a file is written to before being renamed into place"""
+        return storage_file_path.with_name(storage_file_path.name + ".partial")
+
     def _store_file(self, file_path: Path, original_filename: str) -> Path:
         """Store the file in the storage directory with a unique name"""
-        original_path = Path(original_filename)
-        storage_filename = f"{original_path.stem}_{file_path.stat().st_mtime_ns}{original_path.suffix}"
-        storage_file_path = self.storage_path / storage_filename
-        shutil.copy2(file_path, storage_file_path)
+        storage_file_path = self.storage_path_for(original_filename)
+        partial_path = self.partial_path_for(storage_file_path)
+        shutil.copy2(file_path, partial_path)
+        os.replace(partial_path, storage_file_path)
         return storage_file_path
 
     def process_file(self, file_path: Path, enhance_with_ai: bool = True) -> Optional[int]:
@@ -29,36 +56,207 @@ class DocumentProcessor:
 
         # Store file
         stored_path = self._store_file(file_path, file_path.name)
-        
+        return self.process_stored_file(stored_path, file_path.name, enhance_with_ai)
+
+    def process_stored_file(
+        self,
+        stored_path: Path,
+        filename: str,
+        enhance_with_ai: bool = True
+    ) -> Optional[int]:
+        """Process a file that is already in storage and return the document ID"""
+        file_suffix = Path(filename).suffix
+        file_type = file_suffix.lower()[1:]
+
         # Extract text
         try:
-            extracted_text = self.text_extractor.extract_text(file_path)
+            extracted_text, used_ocr = self.text_extractor.extract(stored_path)
             
             # Enhance with AI if requested and if text extraction might be poor
             if enhance_with_ai and extracted_text.strip():
                 enhanced_text = self.ai_processor.enhance_extraction(
                     extracted_text,
-                    file_path.suffix
+                    file_suffix
                 )
                 final_text = enhanced_text
+                prompt_version = self.ai_processor.version()
             else:
                 final_text = extracted_text
+                prompt_version = None
 
             # Save to database
             document = self.document_repository.create(
-                filename=file_path.name,
-                file_type=file_path.suffix.lower()[1:],
+                filename=filename,
+                file_type=file_type,
                 content=final_text,
-                storage_path=str(stored_path)
+                storage_path=str(stored_path),
+                extracted_content=extracted_text,
+                prompt_version=prompt_version,
+                **self._extraction_versions(used_ocr)
             )
             
             return document.id
             
         except Exception as e:
             # In a production environment, you'd want to log this error
-            print(f"Error processing file {file_path}: {str(e)}")
+            print(f"Error processing file {stored_path}: {str(e)}")
             return None
 
+    def enqueue_file(
+        self,
+        file_path: Path,
+        job_repository: JobRepository,
+        enhance_with_ai: bool = True,
+        priority: int = 0
+    ) -> int:
+        """Store a file and queue it for extraction by a worker; return the job ID"""
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        stored_path = self._store_file(file_path, file_path.name)
+        return self.enqueue_stored_file(
+            stored_path,
+            file_path.name,
+            job_repository,
+            enhance_with_ai,
+            priority
+        )
+
+    def enqueue_stored_file(
+        self,
+        stored_path: Path,
+        filename: str,
+        job_repository: JobRepository,
+        enhance_with_ai: bool = True,
+        priority: int = 0
+    ) -> int:
+        """Queue a file that is already in storage for extraction; return the job ID"""
+        job = job_repository.enqueue(
+            JobType.EXTRACT,
+            source_path=str(stored_path),
+            filename=filename,
+            enhance_with_ai=enhance_with_ai,
+            priority=priority
+        )
+        return job.id
+
+    def extract_stored_file(self, stored_path: Path, filename: str, commit: bool = True) -> int:
+        """Extract text from an already stored file and save it; return the document ID.
+
+        With commit=False the document is left uncommitted for the caller.
+        """
+        if not stored_path.exists():
+            raise FileNotFoundError(f"File not found: {stored_path}")
+
+        file_type = Path(filename).suffix.lower()[1:]
+        extracted_text, used_ocr = self.text_extractor.extract(stored_path)
+        document = self.document_repository.create(
+            filename=filename,
+            file_type=file_type,
+            content=extracted_text,
+            storage_path=str(stored_path),
+            extracted_content=extracted_text,
+            commit=commit,
+            **self._extraction_versions(used_ocr)
+        )
+        return document.id
+
+    def enhance_document(self, document_id: int) -> int:
+        """Run AI enhancement over a stored document's extracted text"""
+        document = self.document_repository.get_by_id(document_id)
+        if not document:
+            raise LookupError(f"Document not found with id: {document_id}")
+
+        source_text = document.extracted_content or document.content
+        if source_text and source_text.strip():
+            enhanced_text = self.ai_processor.enhance_extraction(
+                source_text,
+                f".{document.file_type}"
+            )
+            self.document_repository.update_content(
+                document_id,
+                enhanced_text,
+                prompt_version=self.ai_processor.version()
+            )
+        return document_id
+
+    @staticmethod
+    def was_enhanced(document: Document) -> bool:
+        if document.extractor_version is None:
+            # Documents from before versioning don't record whether they were enhanced
+            return settings.REPROCESS_ENHANCE_UNVERSIONED
+        return document.prompt_version is not None
+
+    def stale_stages(self, document: Document) -> Set[str]:
+        """Return the processing stages whose recorded version is out of date.
+
+        Re-extraction only leads to re-enhancement if the text actually
+        changes, which reprocess_document decides once it has the new text.
+        """
+        stages = set()
+        if (
+            document.extracted_content is None
+            or document.extractor_version != self.text_extractor.VERSION
+            or (
+                document.ocr_version is not None
+                and document.ocr_version != self.text_extractor.ocr_version()
+            )
+        ):
+            stages.add(Stage.EXTRACT)
+
+        if self.was_enhanced(document) and document.prompt_version != self.ai_processor.version():
+            stages.add(Stage.ENHANCE)
+        return stages
+
+    def reprocess_document(self, document_id: int) -> int:
+        """Re-run only the outdated stages of a document from its stored file"""
+        document = self.document_repository.get_by_id(document_id)
+        if not document:
+            raise LookupError(f"Document not found with id: {document_id}")
+
+        stages = self.stale_stages(document)
+        if not stages:
+            return document_id
+
+        versions = {}
+        extracted_text = document.extracted_content
+        enhance = Stage.ENHANCE in stages
+        if Stage.EXTRACT in stages:
+            stored_path = Path(document.storage_path)
+            if not stored_path.exists():
+                raise FileNotFoundError(f"File not found: {stored_path}")
+            extracted_text, used_ocr = self.text_extractor.extract(stored_path)
+            versions = self._extraction_versions(used_ocr)
+            # Identical text keeps its (current) enhancement; only the versions move
+            if extracted_text != document.extracted_content and self.was_enhanced(document):
+                enhance = True
+
+        if enhance and extracted_text.strip():
+            final_text = self.ai_processor.enhance_extraction(
+                extracted_text,
+                f".{document.file_type}"
+            )
+            versions["prompt_version"] = self.ai_processor.version()
+        elif enhance:
+            # Blank text has nothing to enhance, but the enhancement is current;
+            # without the stamp the document would stay stale forever
+            final_text = extracted_text
+            versions["prompt_version"] = self.ai_processor.version()
+        elif self.was_enhanced(document) or document.content != document.extracted_content:
+            # Keep enhanced content, including content of unversioned documents
+            # that may have been enhanced before that was recorded
+            final_text = document.content
+        else:
+            final_text = extracted_text
+
+        self.document_repository.update_content(
+            document_id,
+            final_text,
+            extracted_content=extracted_text,
+            **versions
+        )
+        return document_id
+
     def process_directory(self, directory_path: Path, enhance_with_ai: bool = True) -> list[int]:
         """Process all supported files in a directory"""
         if not directory_path.is_dir():
@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional
+from pytesseract import TesseractNotFoundError
+from ...config.settings import settings
+from ...data.models.document import Document
+from ...data.models.job import JobType
+from ...data.repositories.document_repository import DocumentRepository
+from ...data.repositories.job_repository import JobRepository
+from ..document_processor.document_processor import DocumentProcessor, Stage
+
+# Rough characters-per-token ratio used for LLM cost estimates
+CHARS_PER_TOKEN = 4
+
+class Reprocessor:
+    """Finds documents produced by outdated extractor/OCR/prompt versions and
+    queues low-priority reprocess jobs for workers, a batch at a time"""
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        batch_size: int = settings.REPROCESS_BATCH_SIZE,
+        max_pending: int = settings.REPROCESS_MAX_PENDING,
+        poll_interval: float = settings.REPROCESS_POLL_INTERVAL,
+        priority: int = settings.REPROCESS_PRIORITY,
+        checkpoint_path: Optional[Path] = None,
+        processor_factory: Callable[[DocumentRepository], DocumentProcessor] = DocumentProcessor
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.poll_interval = poll_interval
+        self.priority = priority
+        self.checkpoint_path = checkpoint_path or settings.final_reprocess_checkpoint_path
+        self.processor_factory = processor_factory
+        self._stopping = threading.Event()
+
+    def stop(self):
+        """Leave the run loop after the current batch"""
+        self._stopping.set()
+
+    @staticmethod
+    def _current_versions(processor: DocumentProcessor) -> dict:
+        try:
+            ocr_version = processor.text_extractor.ocr_version()
+        except TesseractNotFoundError as e:
+            # Guessing here would mark every OCR document stale
+            raise RuntimeError(
+                "Tesseract is not installed on this host; install it or pin "
+                "OCR_TESSERACT_VERSION to the version the workers run"
+            ) from e
+        return {
+            "extractor_version": processor.text_extractor.VERSION,
+            "ocr_version": ocr_version,
+            "prompt_version": processor.ai_processor.version()
+        }
+
+    def _stale_batch(self, processor: DocumentProcessor, versions: dict,
+                     after_id: int, limit: int) -> List[Document]:
+        return processor.document_repository.get_stale(
+            versions["extractor_version"],
+            versions["ocr_version"],
+            versions["prompt_version"],
+            after_id=after_id,
+            limit=limit
+        )
+
+    def load_checkpoint(self, versions: dict) -> int:
+        """Return the last document ID already queued for these versions, or 0"""
+        try:
+            checkpoint = json.loads(self.checkpoint_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return 0
+        # A new version set means every document has to be looked at again
+        if checkpoint.get("versions") != versions:
+            return 0
+        return checkpoint.get("last_document_id", 0)
+
+    def save_checkpoint(self, versions: dict, last_document_id: int):
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".partial")
+        partial_path.write_text(json.dumps({
+            "versions": versions,
+            "last_document_id": last_document_id
+        }))
+        os.replace(partial_path, self.checkpoint_path)
+
+    def clear_checkpoint(self):
+        self.checkpoint_path.unlink(missing_ok=True)
+
+    def estimate(self) -> dict:
+        """Dry run: count the work a full reprocess would do without queueing anything"""
+        estimate = {
+            "documents": 0,
+            "extract": 0,
+            "ocr_candidates": 0,
+            "enhance": 0,
+            "enhance_if_text_changes": 0,
+            "bytes_to_read": 0,
+            "missing_files": 0,
+            "estimated_llm_input_tokens": 0,
+            "estimated_llm_output_tokens": 0,
+            "conditional_llm_input_tokens": 0,
+            "conditional_llm_output_tokens": 0
+        }
+        db = self.session_factory()
+        try:
+            processor = self.processor_factory(DocumentRepository(db))
+            versions = self._current_versions(processor)
+            last_id = 0
+            while documents := self._stale_batch(processor, versions, last_id, self.batch_size):
+                for document in documents:
+                    last_id = document.id
+                    stages = processor.stale_stages(document)
+                    if not stages:
+                        continue
+                    estimate["documents"] += 1
+                    if Stage.EXTRACT in stages:
+                        estimate["extract"] += 1
+                        # OCR reruns where it ran before; unversioned documents may need it
+                        if document.ocr_version is not None or (
+                            document.extractor_version is None
+                            and document.file_type in processor.text_extractor.OCR_FILE_TYPES
+                        ):
+                            estimate["ocr_candidates"] += 1
+                        try:
+                            estimate["bytes_to_read"] += os.path.getsize(document.storage_path)
+                        except OSError:
+                            estimate["missing_files"] += 1
+
+                    if Stage.ENHANCE in stages:
+                        bucket = "estimated"
+                        estimate["enhance"] += 1
+                    elif Stage.EXTRACT in stages and processor.was_enhanced(document):
+                        # Only re-enhanced if re-extraction produces different text
+                        bucket = "conditional"
+                        estimate["enhance_if_text_changes"] += 1
+                    else:
+                        continue
+                    # Current text stands in for what re-extraction will produce
+                    text = document.extracted_content or document.content or ""
+                    input_tokens = len(text) // CHARS_PER_TOKEN
+                    estimate[f"{bucket}_llm_input_tokens"] += input_tokens
+                    estimate[f"{bucket}_llm_output_tokens"] += min(
+                        input_tokens, processor.ai_processor.MAX_TOKENS
+                    )
+                db.expire_all()
+        finally:
+            db.close()
+        return estimate
+
+    def run(self, max_documents: Optional[int] = None) -> int:
+        """Queue reprocess jobs for stale documents, resuming from the checkpoint.
+
+        At most max_pending reprocess jobs are left unfinished at any time so
+        live ingestion keeps the workers; returns the number of jobs queued.
+        """
+        enqueued = 0
+        db = self.session_factory()
+        try:
+            processor = self.processor_factory(DocumentRepository(db))
+            job_repository = JobRepository(db)
+            versions = self._current_versions(processor)
+            last_id = self.load_checkpoint(versions)
+
+            while not self._stopping.is_set():
+                limit = min(
+                    self.batch_size,
+                    self.max_pending - job_repository.count_unfinished(JobType.REPROCESS)
+                )
+                if max_documents is not None:
+                    if enqueued >= max_documents:
+                        break
+                    limit = min(limit, max_documents - enqueued)
+                if limit <= 0:
+                    self._stopping.wait(self.poll_interval)
+                    continue
+
+                documents = self._stale_batch(processor, versions, last_id, limit)
+                if not documents:
+                    break
+                for document in documents:
+                    if processor.stale_stages(document):
+                        job_repository.enqueue(
+                            JobType.REPROCESS,
+                            document_id=document.id,
+                            priority=self.priority
+                        )
+                        enqueued += 1
+                    last_id = document.id
+                self.save_checkpoint(versions, last_id)
+                db.expire_all()
+        finally:
+            db.close()
+        return enqueued
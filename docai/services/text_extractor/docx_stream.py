@@ -0,0 +1,135 @@
+import posixpath
+import zipfile
+from lxml import etree
+from pathlib import Path
+from typing import IO, Iterator, List, Union
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_NS = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+REL_TYPE_PREFIX = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+
+DOCUMENT_PART = "word/document.xml"
+DOCUMENT_RELS_PART = "word/_rels/document.xml.rels"
+
+# Run-level elements that stand for a single character
+_RUN_CHARS = {
+    W_NS + "tab": "\t",
+    W_NS + "br": "\n",
+    W_NS + "cr": "\n",
+    W_NS + "noBreakHyphen": "-",
+}
+
+_EVENT_TAGS = [
+    W_NS + "p", W_NS + "t", W_NS + "tr", W_NS + "tc", MC_NS + "Fallback",
+    *_RUN_CHARS
+]
+
+# Blocks that are cleared once read
+_BLOCK_TAGS = {W_NS + "p", W_NS + "tr"}
+
+
+def _related_parts(archive: zipfile.ZipFile, rel_type: str) -> List[str]:
+    """Return the zip member names of document parts with the given relationship type"""
+    try:
+        rels_xml = archive.read(DOCUMENT_RELS_PART)
+    except KeyError:
+        return []
+
+    parts = []
+    for rel in etree.fromstring(rels_xml).iter(REL_NS + "Relationship"):
+        if rel.get("Type") != REL_TYPE_PREFIX + rel_type or rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            name = target.lstrip("/")
+        else:
+            name = posixpath.normpath(posixpath.join("word", target))
+        if name in archive.namelist():
+            parts.append(name)
+    return parts
+
+
+def iter_part_text(stream: IO[bytes]) -> Iterator[str]:
+    """Yield one line per paragraph (or table row) of a WordprocessingML part.
+
+    Paragraphs nested in a paragraph (text boxes) are emitted after it rather
+    than splitting it, and the mc:Fallback copy of such content is skipped.
+    """
+    in_fallback = 0
+    # Run text of each open paragraph, innermost last
+    runs: List[List[str]] = []
+    # Finished lines collected by each open paragraph or table cell
+    frames: List[List[str]] = []
+    rows: List[List[str]] = []
+
+    # Only the elements handled below raise events, so formatting markup
+    # (rPr, pPr, sz, ...) never reaches Python
+    events = etree.iterparse(
+        stream,
+        events=("start", "end"),
+        tag=_EVENT_TAGS,
+        resolve_entities=False,
+        no_network=True
+    )
+    for event, elem in events:
+        tag = elem.tag
+        if event == "start":
+            if tag == MC_NS + "Fallback":
+                in_fallback += 1
+            elif in_fallback:
+                pass
+            elif tag == W_NS + "p":
+                runs.append([])
+                frames.append([])
+            elif tag == W_NS + "tr":
+                rows.append([])
+            elif tag == W_NS + "tc":
+                frames.append([])
+            continue
+
+        lines = []
+        if tag == MC_NS + "Fallback":
+            in_fallback -= 1
+        elif in_fallback:
+            pass
+        elif tag == W_NS + "t":
+            if runs:
+                runs[-1].append(elem.text or "")
+        elif tag in _RUN_CHARS:
+            # A w:tab inside w:tabs is a tab stop definition, not a character
+            if runs and elem.getparent().tag != W_NS + "tabs":
+                runs[-1].append(_RUN_CHARS[tag])
+        elif tag == W_NS + "p":
+            lines = ["".join(runs.pop())] + frames.pop()
+        elif tag == W_NS + "tc":
+            rows[-1].append(" ".join(text for text in frames.pop() if text))
+        elif tag == W_NS + "tr":
+            lines = ["\t".join(rows.pop())]
+
+        for line in lines:
+            if frames:
+                frames[-1].append(line)
+            else:
+                yield line
+
+        if not frames and tag in _BLOCK_TAGS:
+            # A top-level block is done: drop it and everything parsed before
+            # it so the tree never grows beyond the block being read
+            elem.clear()
+            parent = elem.getparent()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+def iter_docx_text(file_path: Union[Path, IO[bytes]]) -> Iterator[str]:
+    """Stream the text of a DOCX file: headers, body (including tables), then footers"""
+    with zipfile.ZipFile(file_path) as archive:
+        parts = (
+            _related_parts(archive, "header")
+            + [DOCUMENT_PART]
+            + _related_parts(archive, "footer")
+        )
+        for part in parts:
+            with archive.open(part) as stream:
+                yield from iter_part_text(stream)
@@ -1,20 +1,69 @@
-from typing import Optional
+from typing import Optional, Tuple, Union, BinaryIO
 import PyPDF2
-from docx import Document as DocxDocument
 from openpyxl import load_workbook
 from PIL import Image
 import pytesseract
 from pathlib import Path
 import io
+import mmap
+from functools import lru_cache
+
+from ...config.settings import settings
+from .docx_stream import iter_docx_text
+
+# Extractors accept either a path or an already open (e.g. memory-mapped) buffer
+Source = Union[Path, BinaryIO]
+
+class _MappedFile(mmap.mmap):
+    """Read-only memory map usable wherever a seekable binary file is expected"""
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
 
 class TextExtractor:
+    # Bump whenever extraction output changes so stored documents get reprocessed
+    VERSION = "1"
+    # File types whose text may come from Tesseract
+    OCR_FILE_TYPES = {"pdf", "png", "jpg", "jpeg"}
+    # Extensions whose text always comes from Tesseract
+    OCR_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _tesseract_version() -> str:
+        # Raises TesseractNotFoundError (and is not cached) if Tesseract is missing
+        return str(pytesseract.get_tesseract_version())
+
+    @classmethod
+    def ocr_version(cls) -> str:
+        """Identify the OCR engine and the settings it runs with.
+
+        Uses OCR_TESSERACT_VERSION when pinned, so hosts without Tesseract
+        (e.g. the one scanning for stale documents) agree with the workers.
+        """
+        tesseract_version = settings.OCR_TESSERACT_VERSION or cls._tesseract_version()
+        return f"tesseract-{tesseract_version}/dpi-{settings.OCR_DPI}/lang-{settings.OCR_LANG}"
+
+    @classmethod
+    def _check_tesseract(cls):
+        """Refuse to OCR with a Tesseract other than the pinned one"""
+        installed = cls._tesseract_version()
+        if settings.OCR_TESSERACT_VERSION and installed != settings.OCR_TESSERACT_VERSION:
+            raise RuntimeError(
+                f"Tesseract {installed} is installed but OCR_TESSERACT_VERSION "
+                f"is pinned to {settings.OCR_TESSERACT_VERSION}"
+            )
+
     @staticmethod
     def _convert_pdf_page_to_image(page) -> Image.Image:
         """Convert a PDF page to a PIL Image"""
         # Convert PDF page to image
         try:
             import fitz  # PyMuPDF
-            pix = page.get_pixmap(matrix=fitz.Matrix(300/72, 300/72))  # 300 DPI
+            pix = page.get_pixmap(matrix=fitz.Matrix(settings.OCR_DPI/72, settings.OCR_DPI/72))
             img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
             return img
         except ImportError:
@@ -30,51 +79,80 @@ class TextExtractor:
             pdf_bytes.seek(0)
             
             # Convert to image
-            images = convert_from_bytes(pdf_bytes.getvalue(), dpi=300)
+            images = convert_from_bytes(pdf_bytes.getvalue(), dpi=settings.OCR_DPI)
             return images[0] if images else None
 
     @staticmethod
-    def extract_from_pdf(file_path: Path) -> str:
+    def _read_bytes(source: BinaryIO) -> bytes:
+        """Return the whole buffer as bytes for libraries that only take bytes"""
+        source.seek(0)
+        return source.read()
+
+    @staticmethod
+    def _extract_pdf_text_layer(file: BinaryIO) -> str:
+        text = ""
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page in pdf_reader.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text + "\n"
+        return text
+
+    @staticmethod
+    def extract_from_pdf(file_path: Source) -> str:
+        return TextExtractor._extract_pdf(file_path)[0]
+
+    @staticmethod
+    def _extract_pdf(file_path: Source) -> Tuple[str, bool]:
+        """Extract PDF text, reporting whether it had to fall back to OCR"""
         # First try normal text extraction
         text = ""
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        if isinstance(file_path, Path):
+            with open(file_path, 'rb') as file:
+                text = TextExtractor._extract_pdf_text_layer(file)
+        else:
+            text = TextExtractor._extract_pdf_text_layer(file_path)
         
         # If no text was extracted, try OCR
-        if not text.strip():
+        used_ocr = not text.strip()
+        if used_ocr:
+            TextExtractor._check_tesseract()
             try:
                 import fitz  # PyMuPDF
-                pdf_document = fitz.open(file_path)
+                if isinstance(file_path, Path):
+                    pdf_document = fitz.open(file_path)
+                else:
+                    pdf_document = fitz.open(stream=TextExtractor._read_bytes(file_path), filetype="pdf")
                 for page_num in range(len(pdf_document)):
                     page = pdf_document[page_num]
                     img = TextExtractor._convert_pdf_page_to_image(page)
                     if img:
-                        page_text = pytesseract.image_to_string(img)
+                        page_text = pytesseract.image_to_string(img, lang=settings.OCR_LANG)
                         if page_text:
                             text += page_text + "\n"
                 pdf_document.close()
             except ImportError:
                 # Fallback to pdf2image if PyMuPDF is not available
-                from pdf2image import convert_from_path
-                images = convert_from_path(file_path, dpi=300)
+                from pdf2image import convert_from_path, convert_from_bytes
+                if isinstance(file_path, Path):
+                    images = convert_from_path(file_path, dpi=settings.OCR_DPI)
+                else:
+                    images = convert_from_bytes(TextExtractor._read_bytes(file_path), dpi=settings.OCR_DPI)
                 for img in images:
-                    page_text = pytesseract.image_to_string(img)
+                    page_text = pytesseract.image_to_string(img, lang=settings.OCR_LANG)
                     if page_text:
                         text += page_text + "\n"
         
-        return text.strip()
+        return text.strip(), used_ocr
 
     @staticmethod
-    def extract_from_docx(file_path: Path) -> str:
-        doc = DocxDocument(file_path)
-        return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+    def extract_from_docx(file_path: Source) -> str:
+        # Stream the XML parts straight from the archive instead of building
+        # python-docx's object model; also picks up tables, headers and footers
+        return "\n".join(iter_docx_text(file_path))
 
     @staticmethod
-    def extract_from_xlsx(file_path: Path) -> str:
+    def extract_from_xlsx(file_path: Source) -> str:
         wb = load_workbook(filename=file_path, read_only=True)
         text = []
         for sheet in wb.sheetnames:
@@ -83,18 +161,24 @@ class TextExtractor:
                 row_text = " ".join(str(cell.value) for cell in row if cell.value is not None)
                 if row_text:
                     text.append(row_text)
+        wb.close()
         return "\n".join(text)
 
     @staticmethod
-    def extract_from_image(file_path: Path) -> str:
-        image = Image.open(file_path)
-        return pytesseract.image_to_string(image)
+    def extract_from_image(file_path: Source) -> str:
+        TextExtractor._check_tesseract()
+        with Image.open(file_path) as image:
+            return pytesseract.image_to_string(image, lang=settings.OCR_LANG)
 
     def extract_text(self, file_path: Path) -> Optional[str]:
+        return self.extract(file_path)[0]
+
+    def extract(self, file_path: Path) -> Tuple[str, bool]:
+        """Extract text from a file and report whether Tesseract produced it"""
         file_extension = file_path.suffix.lower()
         
         extractors = {
-            '.pdf': self.extract_from_pdf,
+            '.pdf': self._extract_pdf,
             '.docx': self.extract_from_docx,
             '.xlsx': self.extract_from_xlsx,
             '.png': self.extract_from_image,
@@ -105,5 +189,16 @@ class TextExtractor:
         extractor = extractors.get(file_extension)
         if not extractor:
             raise ValueError(f"Unsupported file type: {file_extension}")
-            
-        return extractor(file_path)
+
+        # Map the file once and let the extractor read from the mapping,
+        # instead of each library opening and re-reading the path
+        with open(file_path, 'rb') as file:
+            if file_path.stat().st_size == 0:
+                result = extractor(file)
+            else:
+                with _MappedFile(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    result = extractor(buffer)
+
+        if file_extension == '.pdf':
+            return result
+        return result, file_extension in self.OCR_IMAGE_EXTENSIONS
@@ -0,0 +1,164 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+from ...config.settings import settings
+from ...data.models.job import Job, JobType
+from ...data.repositories.document_repository import DocumentRepository
+from ...data.repositories.job_repository import JobRepository
+from ..document_processor.document_processor import DocumentProcessor
+
+class LeaseLostError(Exception):
+    """Raised when a worker no longer holds the lease on the job it is running"""
+
+class _Heartbeat:
+    """Keeps a job's lease alive from a background thread while it runs"""
+
+    def __init__(self, session_factory: Callable, job_id: int, worker_id: str,
+                 lease_seconds: int, interval: float):
+        self.session_factory = session_factory
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.interval = interval
+        self.lease_lost = False
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            db = self.session_factory()
+            try:
+                if not JobRepository(db).heartbeat(self.job_id, self.worker_id, self.lease_seconds):
+                    self.lease_lost = True
+                    return
+            except Exception as e:
+                print(f"Heartbeat failed for job {self.job_id}: {str(e)}")
+            finally:
+                db.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+class Worker:
+    def __init__(
+        self,
+        session_factory: Callable,
+        worker_id: Optional[str] = None,
+        job_types: Optional[Sequence[str]] = None,
+        lease_seconds: int = settings.WORKER_LEASE_SECONDS,
+        heartbeat_seconds: float = settings.WORKER_HEARTBEAT_SECONDS,
+        poll_interval: float = settings.WORKER_POLL_INTERVAL,
+        processor_factory: Callable[[DocumentRepository], DocumentProcessor] = DocumentProcessor
+    ):
+        self.session_factory = session_factory
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.job_types = list(job_types) if job_types else None
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_interval = poll_interval
+        self.processor_factory = processor_factory
+        self._stopping = threading.Event()
+        self._next_reap_at = 0.0
+
+    def stop(self):
+        """Finish the current job, then leave the run loop"""
+        self._stopping.set()
+
+    def _execute(self, job: Job, processor: DocumentProcessor, job_repository: JobRepository) -> int:
+        """Run a claimed job and return the document ID it produced or updated"""
+        if job.job_type == JobType.EXTRACT:
+            document_id = job.document_id
+            if document_id is None:
+                # The document is committed together with job.document_id, so a
+                # retry after a later failure reuses it instead of inserting another
+                document_id = processor.extract_stored_file(
+                    Path(job.source_path),
+                    job.filename,
+                    commit=False
+                )
+                if not job_repository.attach_document(job.id, self.worker_id, document_id):
+                    raise LeaseLostError(f"Lost lease on job {job.id}")
+            if job.enhance_with_ai:
+                # Enhancement is its own job so LLM capacity scales separately from
+                # OCR; it is only committed by complete() along with the DONE status
+                job_repository.enqueue(
+                    JobType.ENHANCE,
+                    document_id=document_id,
+                    priority=job.priority,
+                    commit=False
+                )
+            return document_id
+        if job.job_type == JobType.ENHANCE:
+            return processor.enhance_document(job.document_id)
+        if job.job_type == JobType.REPROCESS:
+            return processor.reprocess_document(job.document_id)
+        raise ValueError(f"Unsupported job type: {job.job_type}")
+
+    def run_once(self) -> bool:
+        """Claim and run at most one job; return whether a job was claimed"""
+        db = self.session_factory()
+        try:
+            job_repository = JobRepository(db)
+            # Expired leases can only appear once per lease period, so there is
+            # no point taking the write lock for this on every poll
+            if time.monotonic() >= self._next_reap_at:
+                job_repository.reap_expired()
+                self._next_reap_at = time.monotonic() + self.lease_seconds
+            job = job_repository.claim(self.worker_id, self.lease_seconds, self.job_types)
+            if job is None:
+                return False
+
+            processor = self.processor_factory(DocumentRepository(db))
+            with _Heartbeat(self.session_factory, job.id, self.worker_id,
+                            self.lease_seconds, self.heartbeat_seconds) as heartbeat:
+                try:
+                    document_id = self._execute(job, processor, job_repository)
+                except LeaseLostError as e:
+                    db.rollback()
+                    print(f"{str(e)}; result left to the next claimer")
+                    return True
+                except Exception as e:
+                    db.rollback()
+                    print(f"Error running job {job.id}: {str(e)}")
+                    job_repository.fail(job.id, self.worker_id, str(e))
+                    return True
+
+            if heartbeat.lease_lost:
+                db.rollback()
+                print(f"Lost lease on job {job.id}; result left to the next claimer")
+            elif not job_repository.complete(job.id, self.worker_id, document_id):
+                print(f"Lost lease on job {job.id}; result left to the next claimer")
+            return True
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def run(self, max_jobs: Optional[int] = None) -> int:
+        """Poll for jobs until stopped (or max_jobs have run); return the number run"""
+        processed = 0
+        while not self._stopping.is_set():
+            if max_jobs is not None and processed >= max_jobs:
+                break
+            try:
+                claimed = self.run_once()
+            except Exception as e:
+                # Queue errors (a locked SQLite file, a dropped connection) are
+                # transient; a job claimed before them is retried once its lease expires
+                print(f"Worker {self.worker_id} failed to poll for jobs: {str(e)}")
+                claimed = False
+            if claimed:
+                processed += 1
+            else:
+                self._stopping.wait(self.poll_interval)
+        return processed
@@ -10,6 +10,7 @@ setup(
         "python-multipart==0.0.18",
         "PyPDF2==3.0.1",
         "python-docx==0.8.11",
+        "lxml==6.1.3",
         "openpyxl==3.1.2",
         "Pillow==10.3.0",
         "pytesseract==0.3.10",
@@ -32,5 +33,10 @@ setup(
             "pytest-mock==3.12.0",
         ],
     },
+    entry_points={
+        'console_scripts': [
+            "docai=docai.cli:main",
+        ],
+    },
     python_requires='>=3.8',
 )
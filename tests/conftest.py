@@ -4,6 +4,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from docai.data.models.document import Base
 from docai.data.repositories.document_repository import DocumentRepository
+from docai.data.repositories.job_repository import JobRepository
 from docai.services.text_extractor.text_extractor import TextExtractor
 from docai.services.ai_processor.ai_processor import AIProcessor
 from docai.services.document_processor.document_processor import DocumentProcessor
@@ -22,11 +23,21 @@ def test_db():
         db.close()
         Path("./test.db").unlink(missing_ok=True)
 
+@pytest.fixture
+def session_factory(test_db):
+    """Session factory bound to the test database"""
+    return sessionmaker(autocommit=False, autoflush=True, bind=test_db.get_bind())
+
 @pytest.fixture
 def document_repository(test_db):
     """Create a document repository instance"""
     return DocumentRepository(test_db)
 
+@pytest.fixture
+def job_repository(test_db):
+    """Create a job repository instance"""
+    return JobRepository(test_db)
+
 @pytest.fixture
 def text_extractor():
     """Create a text extractor instance"""
@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+from docai.api.uploads import stream_upload_to_storage
+from docai.config.settings import settings
+
+BOUNDARY = "docai-test-boundary"
+
+def make_request(filename: str, content: bytes, chunk_size: int = 7) -> Request:
+    """Build a multipart request whose body arrives in small chunks"""
+    body = (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="note"\r\n\r\n'
+        "ignored\r\n"
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    async def receive():
+        chunk = chunks.pop(0)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())],
+    }
+    return Request(scope, receive)
+
+def test_stream_upload_to_storage(document_processor):
+    """Test the file part is written straight into storage"""
+    content = b"%PDF-1.3 " + bytes(range(256)) * 10
+    filename, stored_path = asyncio.run(
+        stream_upload_to_storage(make_request("report.pdf", content), document_processor)
+    )
+
+    assert filename == "report.pdf"
+    assert stored_path.parent == document_processor.storage_path
+    assert stored_path.read_bytes() == content
+    assert not document_processor.partial_path_for(stored_path).exists()
+
+def test_stream_upload_enforces_max_size(document_processor, monkeypatch):
+    """Test oversized uploads are rejected while streaming and leave nothing behind"""
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 100)
+    stored_files = set(document_processor.storage_path.iterdir())
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(stream_upload_to_storage(make_request("big.pdf", b"x" * 1000), document_processor))
+
+    assert exc_info.value.status_code == 413
+    assert set(document_processor.storage_path.iterdir()) == stored_files
+
+def test_stream_upload_rejects_unsupported_format(document_processor):
+    """Test unsupported extensions are rejected before anything is written"""
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(stream_upload_to_storage(make_request("notes.txt", b"hello"), document_processor))
+    assert exc_info.value.status_code == 400
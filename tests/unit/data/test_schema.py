@@ -0,0 +1,64 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine.reflection import Inspector
+from docai.data.models.document import Base
+from docai.data.models import job  # noqa: F401
+from docai.data.schema import add_missing_columns
+
+def test_add_missing_columns_upgrades_existing_table(tmp_path):
+    """Test a documents table from before versioning gains the new columns"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE documents (id INTEGER PRIMARY KEY, filename VARCHAR(255) NOT NULL, "
+            "file_type VARCHAR(10) NOT NULL, content TEXT, storage_path VARCHAR(512) NOT NULL, "
+            "created_at DATETIME, updated_at DATETIME)"
+        ))
+        connection.execute(text(
+            "INSERT INTO documents (filename, file_type, content, storage_path) "
+            "VALUES ('a.pdf', 'pdf', 'text', 'storage/a.pdf')"
+        ))
+    Base.metadata.create_all(bind=engine)
+
+    added = add_missing_columns(engine, Base.metadata)
+
+    assert sorted(added) == [
+        "documents.extracted_content",
+        "documents.extractor_version",
+        "documents.ocr_version",
+        "documents.prompt_version",
+    ]
+    inspector = inspect(engine)
+    assert "ix_documents_extractor_version" in {index["name"] for index in inspector.get_indexes("documents")}
+    with engine.connect() as connection:
+        row = connection.execute(text("SELECT content, extractor_version FROM documents")).one()
+    assert tuple(row) == ("text", None)
+    assert add_missing_columns(engine, Base.metadata) == []
+
+def test_add_missing_columns_skips_columns_added_concurrently(tmp_path, monkeypatch):
+    """Test a column another process added after inspection does not fail the upgrade"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE documents (id INTEGER PRIMARY KEY, filename VARCHAR(255) NOT NULL, "
+            "file_type VARCHAR(10) NOT NULL, content TEXT, storage_path VARCHAR(512) NOT NULL, "
+            "created_at DATETIME, updated_at DATETIME, extracted_content TEXT)"
+        ))
+    Base.metadata.create_all(bind=engine)
+
+    # Inspection still reports the column as missing, as it would to a process
+    # that looked before another one ran its ALTER TABLE
+    original_get_columns = Inspector.get_columns
+    calls = {"documents": 0}
+    def stale_get_columns(self, table_name, *args, **kwargs):
+        columns = original_get_columns(self, table_name, *args, **kwargs)
+        if table_name == "documents":
+            calls["documents"] += 1
+            if calls["documents"] == 1:
+                columns = [column for column in columns if column["name"] != "extracted_content"]
+        return columns
+    monkeypatch.setattr(Inspector, "get_columns", stale_get_columns)
+
+    added = add_missing_columns(engine, Base.metadata)
+
+    assert "documents.extracted_content" not in added
+    assert "documents.extractor_version" in added
@@ -48,3 +48,25 @@ def test_store_file(document_processor, mock_pdf_file):
     stored_path = document_processor._store_file(mock_pdf_file, mock_pdf_file.name)
     assert stored_path.exists()
     assert stored_path.is_file()
+
+def test_store_file_leaves_no_partial(document_processor, mock_pdf_file):
+    """Test stored files are renamed into place without leftovers"""
+    stored_path = document_processor._store_file(mock_pdf_file, mock_pdf_file.name)
+    assert stored_path.read_bytes() == mock_pdf_file.read_bytes()
+    assert not document_processor.partial_path_for(stored_path).exists()
+
+def test_process_stored_file_does_not_copy(document_processor, mock_docx_file):
+    """Test processing an already stored file reads it in place"""
+    stored_path = document_processor._store_file(mock_docx_file, "report.docx")
+    stored_files = set(document_processor.storage_path.iterdir())
+
+    doc_id = document_processor.process_stored_file(stored_path, "report.docx", enhance_with_ai=False)
+
+    document = document_processor.document_repository.get_by_id(doc_id)
+    assert document.filename == "report.docx"
+    assert document.storage_path == str(stored_path)
+    assert "This is a test Word document" in document.content
+    assert document.extracted_content == document.content
+    assert document.extractor_version == document_processor.text_extractor.VERSION
+    assert document.prompt_version is None
+    assert set(document_processor.storage_path.iterdir()) == stored_files
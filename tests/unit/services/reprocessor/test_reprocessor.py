@@ -0,0 +1,207 @@
+import pytest
+from unittest.mock import Mock
+from pytesseract import TesseractNotFoundError
+from docai.config.settings import settings
+from docai.data.models.job import Job, JobType
+from docai.services.ai_processor.ai_processor import AIProcessor
+from docai.services.document_processor.document_processor import Stage
+from docai.services.reprocessor.reprocessor import Reprocessor
+from docai.services.text_extractor.text_extractor import TextExtractor
+
+@pytest.fixture(autouse=True)
+def pinned_tesseract(monkeypatch):
+    """Pin the target OCR version so these tests don't need Tesseract installed"""
+    monkeypatch.setattr(settings, "OCR_TESSERACT_VERSION", "5.3.0")
+
+@pytest.fixture
+def create_document(document_repository):
+    """Create documents stamped with the current (or given) stage versions"""
+    def create(file_type="docx", enhanced=False, ocr=False, **versions):
+        values = {
+            "extracted_content": "raw text",
+            "extractor_version": TextExtractor.VERSION,
+            "ocr_version": TextExtractor.ocr_version() if ocr else None,
+            "prompt_version": AIProcessor.version() if enhanced else None,
+            "storage_path": f"doc.{file_type}"
+        }
+        values.update(versions)
+        return document_repository.create(
+            filename=f"doc.{file_type}",
+            file_type=file_type,
+            content="enhanced text" if enhanced else "raw text",
+            **values
+        )
+    return create
+
+@pytest.fixture
+def reprocessor(session_factory, tmp_path):
+    """Reprocessor with a throwaway checkpoint file"""
+    return Reprocessor(
+        session_factory,
+        batch_size=2,
+        max_pending=10,
+        poll_interval=0,
+        checkpoint_path=tmp_path / "checkpoint.json"
+    )
+
+def test_stale_stages(document_processor, create_document, monkeypatch):
+    """Test only outdated stages are reported"""
+    current = create_document(enhanced=True)
+    unenhanced = create_document()
+    old_prompt = create_document(enhanced=True, prompt_version="0/gpt-4")
+    old_ocr = create_document(file_type="png", ocr_version="tesseract-4.0/dpi-300/lang-eng")
+    text_layer_pdf = create_document(file_type="pdf")
+    legacy = create_document(extracted_content=None, extractor_version=None)
+
+    assert document_processor.stale_stages(current) == set()
+    assert document_processor.stale_stages(old_prompt) == {Stage.ENHANCE}
+    assert document_processor.stale_stages(old_ocr) == {Stage.EXTRACT}
+    assert document_processor.stale_stages(text_layer_pdf) == set()
+    assert document_processor.stale_stages(legacy) == {Stage.EXTRACT}
+    monkeypatch.setattr(settings, "REPROCESS_ENHANCE_UNVERSIONED", True)
+    assert document_processor.stale_stages(legacy) == {Stage.EXTRACT, Stage.ENHANCE}
+    monkeypatch.setattr(settings, "REPROCESS_ENHANCE_UNVERSIONED", False)
+
+    monkeypatch.setattr(TextExtractor, "VERSION", "next")
+    assert document_processor.stale_stages(current) == {Stage.EXTRACT}
+    assert document_processor.stale_stages(unenhanced) == {Stage.EXTRACT}
+
+def test_reprocess_document_reruns_only_enhancement(document_processor, create_document):
+    """Test a prompt change re-enhances the stored extraction without re-extracting"""
+    document = create_document(enhanced=True, prompt_version="0/gpt-4")
+    document_processor.text_extractor.extract = Mock()
+    document_processor.ai_processor.enhance_extraction = Mock(return_value="re-enhanced text")
+
+    document_processor.reprocess_document(document.id)
+
+    document_processor.text_extractor.extract.assert_not_called()
+    document_processor.ai_processor.enhance_extraction.assert_called_once_with("raw text", ".docx")
+    document = document_processor.document_repository.get_by_id(document.id)
+    assert document.content == "re-enhanced text"
+    assert document.prompt_version == AIProcessor.version()
+
+def test_reprocess_document_stamps_blank_text_as_enhanced(document_processor, create_document, document_repository):
+    """Test a document with no text to enhance is not left stale by a prompt change"""
+    document = create_document(enhanced=True, prompt_version="0/gpt-4", extracted_content="  ")
+    document_processor.ai_processor.enhance_extraction = Mock()
+
+    document_processor.reprocess_document(document.id)
+
+    document_processor.ai_processor.enhance_extraction.assert_not_called()
+    document = document_repository.get_by_id(document.id)
+    assert document.prompt_version == AIProcessor.version()
+    assert document_processor.stale_stages(document) == set()
+    assert document_repository.get_stale(
+        TextExtractor.VERSION, TextExtractor.ocr_version(), AIProcessor.version()
+    ) == []
+
+@pytest.fixture
+def stored_document(create_document, tmp_path):
+    """Enhanced OCR document whose OCR version is outdated"""
+    def create(**kwargs):
+        stored_file = tmp_path / "scan.png"
+        stored_file.write_bytes(b"image")
+        values = {"ocr_version": "tesseract-4.0/dpi-300/lang-eng", **kwargs}
+        return create_document(
+            file_type="png",
+            enhanced=True,
+            storage_path=str(stored_file),
+            **values
+        )
+    return create
+
+def test_reprocess_document_skips_enhancement_for_identical_text(document_processor, stored_document):
+    """Test an OCR upgrade that reproduces the same text only moves the versions"""
+    document = stored_document()
+    document_processor.text_extractor.extract = Mock(return_value=("raw text", True))
+    document_processor.ai_processor.enhance_extraction = Mock()
+
+    document_processor.reprocess_document(document.id)
+
+    document_processor.ai_processor.enhance_extraction.assert_not_called()
+    document = document_processor.document_repository.get_by_id(document.id)
+    assert document.content == "enhanced text"
+    assert document.ocr_version == TextExtractor.ocr_version()
+    assert document_processor.stale_stages(document) == set()
+
+def test_reprocess_document_reenhances_changed_text(document_processor, stored_document):
+    """Test re-extracted text that differs is enhanced again"""
+    document = stored_document()
+    document_processor.text_extractor.extract = Mock(return_value=("better raw text", True))
+    document_processor.ai_processor.enhance_extraction = Mock(return_value="re-enhanced text")
+
+    document_processor.reprocess_document(document.id)
+
+    document_processor.ai_processor.enhance_extraction.assert_called_once_with("better raw text", ".png")
+    document = document_processor.document_repository.get_by_id(document.id)
+    assert document.content == "re-enhanced text"
+    assert document.extracted_content == "better raw text"
+
+def test_reprocess_unversioned_document_only_reextracts(document_processor, stored_document):
+    """Test documents from before versioning are re-extracted without the LLM by default"""
+    document = stored_document(extracted_content=None, extractor_version=None, ocr_version=None, prompt_version=None)
+    document_processor.text_extractor.extract = Mock(return_value=("better raw text", True))
+    document_processor.ai_processor.enhance_extraction = Mock()
+
+    document_processor.reprocess_document(document.id)
+
+    document_processor.ai_processor.enhance_extraction.assert_not_called()
+    document = document_processor.document_repository.get_by_id(document.id)
+    assert document.content == "enhanced text"
+    assert document.extracted_content == "better raw text"
+    assert document.extractor_version == TextExtractor.VERSION
+    assert document_processor.stale_stages(document) == set()
+
+def test_estimate_is_dry_run(reprocessor, create_document, job_repository):
+    """Test the estimate counts stale work without queueing jobs"""
+    create_document(enhanced=True)
+    create_document(enhanced=True, prompt_version="0/gpt-4")
+    create_document(file_type="pdf", extractor_version="0")
+    create_document(file_type="png", enhanced=True, ocr_version="tesseract-4.0/dpi-300/lang-eng")
+
+    estimate = reprocessor.estimate()
+
+    assert estimate["documents"] == 3
+    assert estimate["extract"] == 2
+    assert estimate["ocr_candidates"] == 1
+    assert estimate["enhance"] == 1
+    assert estimate["enhance_if_text_changes"] == 1
+    assert estimate["missing_files"] == 2
+    assert estimate["estimated_llm_input_tokens"] == len("raw text") // 4
+    assert estimate["conditional_llm_input_tokens"] == len("raw text") // 4
+    assert job_repository.count_unfinished(JobType.REPROCESS) == 0
+
+def test_run_queues_stale_documents_and_checkpoints(reprocessor, create_document, job_repository):
+    """Test stale documents are queued once and the scan resumes from the checkpoint"""
+    create_document()
+    stale = [create_document(extractor_version="0") for _ in range(3)]
+
+    assert reprocessor.run() == 3
+    queued = job_repository.db_session.query(Job).filter(Job.job_type == JobType.REPROCESS).all()
+    assert sorted(job.document_id for job in queued) == [document.id for document in stale]
+    assert all(job.priority == reprocessor.priority for job in queued)
+
+    assert reprocessor.run() == 0
+    reprocessor.clear_checkpoint()
+    assert reprocessor.run() == 3
+
+def test_run_respects_max_pending(reprocessor, create_document, job_repository):
+    """Test no more than max_pending reprocess jobs are left unfinished"""
+    for _ in range(5):
+        create_document(extractor_version="0")
+    reprocessor.max_pending = 2
+
+    assert reprocessor.run(max_documents=2) == 2
+    assert job_repository.count_unfinished(JobType.REPROCESS) == 2
+
+def test_estimate_requires_tesseract_or_pin(reprocessor, create_document, monkeypatch):
+    """Test a host without Tesseract refuses to guess the OCR version"""
+    def missing_tesseract():
+        raise TesseractNotFoundError()
+    monkeypatch.setattr(settings, "OCR_TESSERACT_VERSION", "")
+    monkeypatch.setattr(TextExtractor, "_tesseract_version", staticmethod(missing_tesseract))
+    create_document(extractor_version="0")
+
+    with pytest.raises(RuntimeError) as exc_info:
+        reprocessor.estimate()
+    assert "OCR_TESSERACT_VERSION" in str(exc_info.value)
@@ -28,6 +28,100 @@ def test_extract_from_docx(text_extractor, mock_docx_file):
     text = text_extractor.extract_from_docx(mock_docx_file)
     assert "This is a test Word document" in text
 
+@pytest.fixture
+def mock_docx_with_table_and_header(tmp_path):
+    from docx import Document
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Quarterly report header"
+    doc.sections[0].footer.paragraphs[0].text = "Page footer"
+    doc.add_paragraph("Intro paragraph")
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Name"
+    table.cell(0, 1).text = "Value"
+    table.cell(1, 0).text = "Total"
+    table.cell(1, 1).text = "42"
+    doc.add_paragraph("Closing paragraph")
+    docx_file = tmp_path / "report.docx"
+    doc.save(docx_file)
+    return docx_file
+
+def test_extract_from_docx_includes_tables_headers_and_footers(text_extractor, mock_docx_with_table_and_header):
+    """Test DOCX extraction keeps tables, headers and footers in document order"""
+    lines = text_extractor.extract_from_docx(mock_docx_with_table_and_header).split("\n")
+    assert lines == [
+        "Quarterly report header",
+        "Intro paragraph",
+        "Name\tValue",
+        "Total\t42",
+        "Closing paragraph",
+        "Page footer",
+    ]
+
+def test_extract_from_docx_matches_python_docx_paragraphs(text_extractor, mock_docx_file):
+    """Test streamed DOCX body text matches python-docx paragraph text"""
+    from docx import Document
+    expected = [paragraph.text for paragraph in Document(mock_docx_file).paragraphs]
+    assert text_extractor.extract_from_docx(mock_docx_file).split("\n") == expected
+
+@pytest.fixture
+def mock_docx_with_text_box(tmp_path):
+    """DOCX whose paragraph contains a text box saved as Choice plus Fallback, like Word does"""
+    import zipfile
+    text_box = (
+        '<w:txbxContent><w:p><w:r><w:t>Box text</w:t></w:r></w:p></w:txbxContent>'
+    )
+    document_xml = (
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+        ' xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006">'
+        '<w:body><w:p>'
+        '<w:r><w:t xml:space="preserve">Before </w:t></w:r>'
+        '<w:r><mc:AlternateContent>'
+        f'<mc:Choice Requires="wps"><w:drawing>{text_box}</w:drawing></mc:Choice>'
+        f'<mc:Fallback><w:pict>{text_box}</w:pict></mc:Fallback>'
+        '</mc:AlternateContent></w:r>'
+        '<w:r><w:t>after</w:t></w:r>'
+        '</w:p></w:body></w:document>'
+    )
+    docx_file = tmp_path / "text_box.docx"
+    with zipfile.ZipFile(docx_file, "w") as archive:
+        archive.writestr("word/document.xml", document_xml)
+    return docx_file
+
+def test_extract_from_docx_text_box(text_extractor, mock_docx_with_text_box):
+    """Test text boxes are emitted once, after the paragraph that anchors them"""
+    lines = text_extractor.extract_from_docx(mock_docx_with_text_box).split("\n")
+    assert lines == ["Before after", "Box text"]
+
+def test_extract_from_docx_accepts_buffer(text_extractor, mock_docx_file):
+    """Test DOCX extraction from an already open buffer"""
+    with open(mock_docx_file, 'rb') as buffer:
+        assert "This is a test Word document" in text_extractor.extract_from_docx(buffer)
+
+def test_extract_text_docx(text_extractor, mock_docx_file):
+    """Test extract_text reads through a memory-mapped buffer"""
+    assert "This is a test Word document" in text_extractor.extract_text(mock_docx_file)
+
+def test_extract_reports_ocr_use(text_extractor, mock_docx_file):
+    """Test extract reports that DOCX text did not come from OCR"""
+    text, used_ocr = text_extractor.extract(mock_docx_file)
+    assert "This is a test Word document" in text
+    assert used_ocr is False
+
+def test_ocr_version_uses_pinned_tesseract(monkeypatch):
+    """Test a pinned Tesseract version is used without querying the binary"""
+    from docai.config.settings import settings
+    monkeypatch.setattr(settings, "OCR_TESSERACT_VERSION", "5.3.0")
+    monkeypatch.setattr(TextExtractor, "_tesseract_version", staticmethod(lambda: pytest.fail("queried")))
+    assert TextExtractor.ocr_version().startswith("tesseract-5.3.0/")
+
+def test_ocr_refuses_unpinned_tesseract_version(monkeypatch):
+    """Test OCR does not run with a Tesseract other than the pinned one"""
+    from docai.config.settings import settings
+    monkeypatch.setattr(settings, "OCR_TESSERACT_VERSION", "5.3.0")
+    monkeypatch.setattr(TextExtractor, "_tesseract_version", staticmethod(lambda: "4.1.1"))
+    with pytest.raises(RuntimeError):
+        TextExtractor.extract_from_image(Path("scan.png"))
+
 def test_extract_text_with_unsupported_format(text_extractor):
     """Test handling of unsupported file format"""
     with pytest.raises(ValueError) as exc_info:
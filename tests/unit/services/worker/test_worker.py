@@ -0,0 +1,211 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+from sqlalchemy.exc import OperationalError
+from docai.data.models.document import Document
+from docai.data.models.job import Job, JobStatus, JobType
+from docai.data.repositories.job_repository import JobRepository
+from docai.services.document_processor.document_processor import DocumentProcessor
+from docai.services.worker.worker import Worker
+
+@pytest.fixture
+def mock_processor():
+    """Mock document processor"""
+    mock = Mock()
+    mock.extract_stored_file.return_value = 7
+    mock.enhance_document.return_value = 7
+    return mock
+
+def make_worker(session_factory, processor, **kwargs):
+    return Worker(
+        session_factory,
+        heartbeat_seconds=60,
+        poll_interval=0,
+        processor_factory=lambda repository: processor,
+        **kwargs
+    )
+
+def test_claim_orders_by_priority(job_repository):
+    """Test higher priority jobs are claimed first"""
+    low = job_repository.enqueue(JobType.EXTRACT, source_path="a.pdf", filename="a.pdf")
+    high = job_repository.enqueue(JobType.EXTRACT, source_path="b.pdf", filename="b.pdf", priority=5)
+
+    first = job_repository.claim("worker-1", lease_seconds=60)
+    second = job_repository.claim("worker-2", lease_seconds=60)
+
+    assert (first.id, second.id) == (high.id, low.id)
+    assert first.status == JobStatus.RUNNING
+    assert first.lease_owner == "worker-1"
+    assert first.attempts == 1
+    assert job_repository.claim("worker-3", lease_seconds=60) is None
+
+def test_claim_filters_job_types(job_repository):
+    """Test workers only claim the job types they serve"""
+    job_repository.enqueue(JobType.EXTRACT, source_path="a.pdf", filename="a.pdf")
+    assert job_repository.claim("worker-1", 60, job_types=[JobType.ENHANCE]) is None
+    assert job_repository.claim("worker-1", 60, job_types=[JobType.EXTRACT]) is not None
+
+def test_expired_lease_is_reclaimed(job_repository, test_db):
+    """Test a job whose worker stopped heartbeating can be claimed again"""
+    job = job_repository.enqueue(JobType.EXTRACT, source_path="a.pdf", filename="a.pdf")
+    job_repository.claim("worker-1", lease_seconds=60)
+    test_db.query(Job).filter(Job.id == job.id).update(
+        {Job.lease_expires_at: datetime.utcnow() - timedelta(seconds=1)}
+    )
+    test_db.commit()
+
+    reclaimed = job_repository.claim("worker-2", lease_seconds=60)
+    assert reclaimed.id == job.id
+    assert reclaimed.lease_owner == "worker-2"
+    assert reclaimed.attempts == 2
+    assert not job_repository.heartbeat(job.id, "worker-1", 60)
+    assert not job_repository.complete(job.id, "worker-1")
+
+def test_fail_retries_then_gives_up(job_repository):
+    """Test failed jobs are retried until max_attempts is reached"""
+    job = job_repository.enqueue(JobType.EXTRACT, source_path="a.pdf", filename="a.pdf", max_attempts=2)
+
+    job_repository.claim("worker-1", lease_seconds=60)
+    job_repository.fail(job.id, "worker-1", "boom")
+    job = job_repository.get_by_id(job.id)
+    assert job.status == JobStatus.PENDING
+    assert job.available_at > datetime.utcnow()
+
+    job.available_at = datetime.utcnow() - timedelta(seconds=1)
+    job_repository.db_session.commit()
+    job_repository.claim("worker-1", lease_seconds=60)
+    job_repository.fail(job.id, "worker-1", "boom again")
+    job = job_repository.get_by_id(job.id)
+    assert job.status == JobStatus.FAILED
+    assert job.last_error == "boom again"
+
+def test_worker_runs_extract_then_enhance(session_factory, job_repository, mock_processor):
+    """Test an extraction job queues a follow-up enhancement job"""
+    job = job_repository.enqueue(JobType.EXTRACT, source_path="a.pdf", filename="a.pdf", enhance_with_ai=True)
+    worker = make_worker(session_factory, mock_processor)
+
+    assert worker.run(max_jobs=2) == 2
+
+    mock_processor.extract_stored_file.assert_called_once()
+    mock_processor.enhance_document.assert_called_once_with(7)
+    job_repository.db_session.expire_all()
+    assert job_repository.get_by_id(job.id).status == JobStatus.DONE
+    assert job_repository.get_by_id(job.id).document_id == 7
+
+def test_worker_records_failures(session_factory, job_repository, mock_processor):
+    """Test a raising job is released for retry with its error recorded"""
+    mock_processor.extract_stored_file.side_effect = RuntimeError("OCR failed")
+    job = job_repository.enqueue(JobType.EXTRACT, source_path="a.pdf", filename="a.pdf")
+    worker = make_worker(session_factory, mock_processor)
+
+    assert worker.run_once()
+
+    job_repository.db_session.expire_all()
+    job = job_repository.get_by_id(job.id)
+    assert job.status == JobStatus.PENDING
+    assert job.last_error == "OCR failed"
+    assert not worker.run_once()
+
+def test_retried_extract_job_creates_one_document(session_factory, job_repository, mock_pdf_file, monkeypatch):
+    """Test a retry after a partial failure reuses the document from the first attempt"""
+    def make_processor(repository):
+        processor = DocumentProcessor(repository)
+        processor.text_extractor.extract = Mock(return_value=("Extracted text", False))
+        return processor
+
+    original_enqueue = JobRepository.enqueue
+    calls = {"enhance": 0}
+    def flaky_enqueue(self, job_type, *args, **kwargs):
+        if job_type == JobType.ENHANCE:
+            calls["enhance"] += 1
+            if calls["enhance"] == 1:
+                raise RuntimeError("database unavailable")
+        return original_enqueue(self, job_type, *args, **kwargs)
+    monkeypatch.setattr(JobRepository, "enqueue", flaky_enqueue)
+
+    job = job_repository.enqueue(
+        JobType.EXTRACT,
+        source_path=str(mock_pdf_file),
+        filename=mock_pdf_file.name,
+        enhance_with_ai=True
+    )
+    worker = Worker(
+        session_factory,
+        heartbeat_seconds=60,
+        poll_interval=0,
+        processor_factory=make_processor,
+        job_types=[JobType.EXTRACT]
+    )
+
+    assert worker.run_once()
+    job_repository.db_session.query(Job).filter(Job.id == job.id).update(
+        {Job.available_at: datetime.utcnow() - timedelta(seconds=1)}
+    )
+    job_repository.db_session.commit()
+    assert worker.run_once()
+
+    db = job_repository.db_session
+    db.expire_all()
+    documents = db.query(Document).all()
+    assert len(documents) == 1
+    job = job_repository.get_by_id(job.id)
+    assert job.status == JobStatus.DONE
+    assert job.document_id == documents[0].id
+    enhance_jobs = db.query(Job).filter(Job.job_type == JobType.ENHANCE).all()
+    assert [enhance_job.document_id for enhance_job in enhance_jobs] == [documents[0].id]
+
+def test_lost_lease_discards_extracted_document(session_factory, job_repository, mock_pdf_file):
+    """Test a worker that lost its lease does not commit a document"""
+    job = job_repository.enqueue(JobType.EXTRACT, source_path=str(mock_pdf_file), filename=mock_pdf_file.name)
+
+    def make_processor(repository):
+        processor = DocumentProcessor(repository)
+        def extract_while_lease_is_taken(path):
+            # Another worker reclaims the job while this one is extracting
+            other = JobRepository(session_factory())
+            other.db_session.query(Job).filter(Job.id == job.id).update({Job.lease_owner: "other"})
+            other.db_session.commit()
+            other.db_session.close()
+            return "Extracted text", False
+        processor.text_extractor.extract = extract_while_lease_is_taken
+        return processor
+
+    worker = Worker(session_factory, heartbeat_seconds=60, poll_interval=0, processor_factory=make_processor)
+    assert worker.run_once()
+
+    db = job_repository.db_session
+    db.expire_all()
+    assert db.query(Document).count() == 0
+    assert job_repository.get_by_id(job.id).document_id is None
+
+def test_worker_reaps_expired_leases_once_per_lease_period(session_factory, mock_processor):
+    """Test idle polling does not run the expired-lease reaper every time"""
+    worker = make_worker(session_factory, mock_processor, lease_seconds=60)
+    with patch.object(JobRepository, "reap_expired", return_value=0) as reap_expired:
+        assert not worker.run_once()
+        assert not worker.run_once()
+        assert reap_expired.call_count == 1
+
+        worker._next_reap_at = 0.0
+        assert not worker.run_once()
+        assert reap_expired.call_count == 2
+
+def test_worker_keeps_polling_after_queue_error(session_factory, job_repository, mock_processor):
+    """Test a database error while claiming does not stop the worker"""
+    job = job_repository.enqueue(JobType.EXTRACT, source_path="a.pdf", filename="a.pdf")
+    worker = make_worker(session_factory, mock_processor)
+
+    original_claim = JobRepository.claim
+    calls = {"claim": 0}
+    def flaky_claim(self, *args, **kwargs):
+        calls["claim"] += 1
+        if calls["claim"] == 1:
+            raise OperationalError("SELECT", {}, Exception("database is locked"))
+        return original_claim(self, *args, **kwargs)
+
+    with patch.object(JobRepository, "claim", flaky_claim):
+        assert worker.run(max_jobs=1) == 1
+
+    assert calls["claim"] == 2
+    job_repository.db_session.expire_all()
+    assert job_repository.get_by_id(job.id).status == JobStatus.DONE